@@ -1,9 +1,13 @@
+import logging
+
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import VideoInfoRequest, DownloadResponse
 from app.services.download_service import download_service
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 
 @router.post("/download-simple", response_model=DownloadResponse)
 async def download_video_simple(request: VideoInfoRequest):
@@ -16,5 +20,5 @@ async def download_video_simple(request: VideoInfoRequest):
             status="downloading"
         )
     except Exception as e:
-        print(f"❌ Error starting download: {str(e)}")
+        logger.error("❌ Error starting download: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,13 @@
+import logging
+
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import VideoInfoRequest, DownloadResponse
 from app.services.download_service import download_service
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 
 @router.post("/download-1080p", response_model=DownloadResponse)
 async def download_video_1080p(request: VideoInfoRequest):
@@ -16,7 +20,7 @@ async def download_video_1080p(request: VideoInfoRequest):
             status="downloading"
         )
     except Exception as e:
-        print(f"❌ Error starting 1080p download: {str(e)}")
+        logger.error("❌ Error starting 1080p download: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -31,7 +35,7 @@ async def download_video_720p(request: VideoInfoRequest):
             status="downloading"
         )
     except Exception as e:
-        print(f"❌ Error starting 720p download: {str(e)}")
+        logger.error("❌ Error starting 720p download: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -46,7 +50,7 @@ async def download_video_480p(request: VideoInfoRequest):
             status="downloading"
         )
     except Exception as e:
-        print(f"❌ Error starting 480p download: {str(e)}")
+        logger.error("❌ Error starting 480p download: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -61,5 +65,5 @@ async def download_video_360p(request: VideoInfoRequest):
             status="downloading"
         )
     except Exception as e:
-        print(f"❌ Error starting 360p download: {str(e)}")
+        logger.error("❌ Error starting 360p download: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
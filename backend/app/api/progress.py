@@ -1,11 +1,16 @@
-import json
-import asyncio
+import logging
+import orjson
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-from app.services.download_service import download_service
+from app.services.download_service import download_service, SSE_PREFIX, SSE_SUFFIX
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+# Constant frame; no need to re-encode it every 30s per subscriber
+_KEEPALIVE_FRAME = b'data: {"status": "keepalive"}\n\n'
+
 
 @router.get("/download-progress/{download_id}")
 async def get_download_progress(download_id: str):
@@ -18,46 +23,56 @@ async def get_download_progress(download_id: str):
 
 @router.get("/download-progress-stream/{download_id}")
 async def get_download_progress_stream(download_id: str):
-    """Stream download progress in real-time using Server-Sent Events"""
-    print(f"📊 Progress stream request for: {download_id}")
+    """Stream download progress in real-time using Server-Sent Events.
 
-    async def event_generator():
-        # Create a queue for this subscriber
-        queue = asyncio.Queue()
+    Updates are pushed purely by the broadcast condition; there is no
+    polling. A single shared ticker wakes idle connections for a keepalive
+    frame every 25s, which clients should treat as a ping.
+    """
+    logger.info("📊 Progress stream request for: %s", download_id)
 
-        # Add to subscribers
-        if download_id not in download_service.progress_subscribers:
-            download_service.progress_subscribers[download_id] = []
-        download_service.progress_subscribers[download_id].append(queue)
+    async def event_generator():
+        # All subscribers share one broadcast channel per download
+        channel = download_service.get_progress_channel(download_id)
+        channel['waiters'] += 1
+        last_version = 0
+        cond = channel['cond']
 
         try:
-            # Send initial progress if available
-            if download_id in download_service.download_progress:
-                initial_progress = download_service.download_progress[download_id]
-                yield f"data: {json.dumps(initial_progress)}\n\n"
+            # Send initial progress if available (single dict lookup)
+            initial_progress = download_service.download_progress.get(download_id)
+            if initial_progress is not None:
+                yield SSE_PREFIX + orjson.dumps(initial_progress) + SSE_SUFFIX
 
             # Stream updates
+            last_keepalive = download_service.keepalive_gen
             while True:
-                try:
-                    # Wait for progress update
-                    progress_data = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(progress_data)}\n\n"
-
-                    # If completed or failed, break
-                    if progress_data['status'] in ['completed', 'failed', 'cancelled']:
-                        break
-
-                except asyncio.TimeoutError:
-                    # Send keepalive
-                    yield f"data: {json.dumps({'status': 'keepalive'})}\n\n"
+                # Wait until the channel version moves past what we sent or
+                # the shared keepalive ticker fires
+                async with cond:
+                    await cond.wait_for(
+                        lambda: channel['version'] != last_version
+                        or download_service.keepalive_gen != last_keepalive
+                    )
+                last_keepalive = download_service.keepalive_gen
+
+                if channel['version'] == last_version:
+                    # Woken by the ticker alone; ping the client
+                    yield _KEEPALIVE_FRAME
+                    continue
+
+                last_version = channel['version']
+                yield channel['frame']
+
+                # If completed or failed, break
+                if channel['state']['status'] in ['completed', 'failed', 'cancelled']:
+                    break
 
         finally:
-            # Remove from subscribers
-            if download_id in download_service.progress_subscribers:
-                try:
-                    download_service.progress_subscribers[download_id].remove(queue)
-                except:
-                    pass
+            channel['waiters'] -= 1
+            # Last subscriber of an already-evicted download drops the channel
+            if channel['waiters'] <= 0 and download_id not in download_service.download_progress:
+                download_service.progress_subscribers.pop(download_id, None)
 
     return StreamingResponse(
         event_generator(),
@@ -74,7 +89,7 @@ async def get_download_progress_stream(download_id: str):
 @router.delete("/downloads/{download_id}")
 async def cancel_download(download_id: str):
     """Cancel or delete a download"""
-    print(f"🚫 Cancelling download: {download_id}")
+    logger.info("🚫 Cancelling download: %s", download_id)
 
     if download_service.cancel_download(download_id):
         return {"message": "Download cancelled successfully"}
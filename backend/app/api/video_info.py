@@ -1,9 +1,13 @@
+import logging
+
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import VideoInfoRequest, VideoInfo
 from app.services.download_service import download_service
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 
 @router.post("/video-info", response_model=VideoInfo)
 async def get_video_info(request: VideoInfoRequest):
@@ -11,5 +15,5 @@ async def get_video_info(request: VideoInfoRequest):
     try:
         return await download_service.get_video_info_async(request.url)
     except Exception as e:
-        print(f"❌ Error extracting video info: {str(e)}")
+        logger.error("❌ Error extracting video info: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -19,6 +19,26 @@ ALLOWED_ORIGINS = [
 HOST = "0.0.0.0"
 PORT = 8000
 
+# Number of DASH/HLS fragments yt-dlp fetches in parallel per download.
+# 8 keeps a single download well past YouTube's per-connection throttle
+# while MAX_CONCURRENT_DOWNLOADS bounds the total connection count
+CONCURRENT_FRAGMENTS = 8
+
+# Cap on simultaneous yt-dlp downloads; extra requests wait in a queue.
+# Overridable per deployment without a code change
+MAX_CONCURRENT_DOWNLOADS = int(os.environ.get("MAX_CONCURRENT_DOWNLOADS", 4))
+
+# How long extracted video info stays valid (seconds); YouTube format URLs
+# expire after a few hours so keep this comfortably shorter
+INFO_CACHE_TTL = 600
+
+# Upstream metadata extractions allowed per minute across all endpoints
+EXTRACT_RATE_PER_MINUTE = 10
+
+# How long finished/failed/cancelled download state is kept for late
+# progress queries before eviction (seconds)
+PROGRESS_RETENTION = 300
+
 # yt-dlp settings
 YT_DLP_OPTIONS = {
     'quiet': True,
@@ -27,8 +47,6 @@ YT_DLP_OPTIONS = {
     'extractor_retries': 3,
     'fragment_retries': 3,
     'retries': 3,
-    'sleep_interval': 1,
-    'max_sleep_interval': 5,
     'http_headers': {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -0,0 +1,37 @@
+import logging
+import logging.handlers
+import queue
+
+_listener = None
+
+
+def setup_logging(level=logging.INFO):
+    """Route app logging through a queue so emitting never blocks on stdout.
+
+    Handlers run on the QueueListener's thread; callers only pay for an
+    enqueue, which keeps logging out of the event loop and the download
+    threads' hot paths.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush and stop the queue listener; called on app shutdown"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -2,7 +2,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import ALLOWED_ORIGINS, HOST, PORT, DOWNLOADS_DIR
+from app.core.logging import setup_logging, shutdown_logging
 from app.api import video_info, download, progress, download_quality
+from app.services.download_service import download_service, shutdown_executor
+
+setup_logging()
 
 app = FastAPI(title="YouTube Downloader API")
 
@@ -27,6 +31,14 @@ async def root():
     return {"message": "YouTube Downloader API is running"}
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await download_service.wait_for_downloads()
+    download_service.stop_keepalive()
+    shutdown_executor()
+    shutdown_logging()
+
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting YouTube Downloader API server...")
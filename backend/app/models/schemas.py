@@ -19,6 +19,9 @@ class VideoFormat(BaseModel):
     format_id: str
     ext: str
     resolution: str
+    # Numeric height so consumers can order formats without parsing the
+    # resolution string
+    height: int = 0
     filesize: Optional[int]
     vcodec: str
     acodec: str
@@ -1,83 +1,279 @@
 import yt_dlp
 import os
+import copy
+import time
 import asyncio
+import logging
+import threading
+import orjson
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any
 
-from app.core.config import DOWNLOADS_DIR, YT_DLP_OPTIONS
+from app.core.config import (
+    DOWNLOADS_DIR, YT_DLP_OPTIONS, CONCURRENT_FRAGMENTS, MAX_CONCURRENT_DOWNLOADS,
+    INFO_CACHE_TTL, EXTRACT_RATE_PER_MINUTE, PROGRESS_RETENTION
+)
 from app.models.schemas import VideoFormat, VideoInfo
 from app.utils.helpers import (
-    get_download_id, sanitize_filename, format_duration, 
-    get_resolution_string, format_speed, format_eta
+    get_download_id, sanitize_filename, format_duration,
+    get_resolution_string, format_speed, format_eta, normalize_url
 )
 
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress updates per download; yt-dlp calls the
+# hook for every buffered chunk
+PROGRESS_INTERVAL = 0.25
+
+# Seconds between SSE keepalive ticks; one shared timer serves every
+# subscriber rather than one timeout per connection
+KEEPALIVE_INTERVAL = 25.0
+
+TERMINAL_STATES = ('completed', 'failed', 'cancelled')
+
+# SSE wire framing, shared with the progress API so every frame is built
+# from the same pre-allocated byte constants
+SSE_PREFIX = b"data: "
+SSE_SUFFIX = b"\n\n"
+
+# Hard bound on tracked downloads; timed eviction handles the normal case,
+# this keeps the map finite if retention timers pile up under load
+PROGRESS_LRU_MAX = 1024
+
+# Hard bound on cached extractions; each info dict carries the full
+# formats list and can run to hundreds of KB
+INFO_CACHE_MAX = 64
+
+# Shared executor for all yt-dlp work; creating a pool per call spawns and
+# joins threads on every request
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ytdlp")
+
+
+def shutdown_executor():
+    """Shut down the shared yt-dlp executor; called on app shutdown"""
+    _EXECUTOR.shutdown(wait=False)
+
+
+# Options shared by every download variant; outtmpl and progress hooks are
+# per-call and added at download time
+BASE_DOWNLOAD_OPTS = {
+    'quiet': False,
+    'no_warnings': False,
+    'extractor_retries': 3,
+    'fragment_retries': 3,
+    'retries': 3,
+    # 10 MB ranges: fewer request round-trips and syscalls than 1 MB while
+    # still fine-grained enough for progress reporting
+    'http_chunk_size': 10 * 1024 * 1024,
+    'concurrent_fragment_downloads': CONCURRENT_FRAGMENTS,
+    'http_headers': {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    },
+    'postprocessors': [{
+        # Remux only; a full FFmpegVideoConvertor re-encode is
+        # ~20x slower and unnecessary for MP4-compatible codecs
+        'key': 'FFmpegVideoRemuxer',
+        'preferedformat': 'mp4',
+    }],
+    'merge_output_format': 'mp4',
+    'prefer_ffmpeg': True,
+}
+
+# Per-variant deltas applied on top of BASE_DOWNLOAD_OPTS
+DOWNLOAD_PROFILES = {
+    'simple': {
+        'format': 'best[height<=1080]+bestaudio/best[height<=720]+bestaudio/best[height<=480]+bestaudio/best',
+        'extractor_retries': 2,
+        'fragment_retries': 2,
+        'retries': 2,
+        'http_headers': {
+            'User-Agent': 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+        },
+    },
+    '1080p': {'format': 'best[height<=1080]+bestaudio/best[height<=1080]/best'},
+    '720p': {'format': 'best[height<=720]+bestaudio/best[height<=720]/best'},
+    '480p': {'format': 'best[height<=480]+bestaudio/best[height<=480]/best'},
+    '360p': {'format': 'best[height<=360]+bestaudio/best[height<=360]/best'},
+}
+
+# Used when an unknown quality label slips through
+FALLBACK_PROFILE = {'format': 'best+bestaudio/best'}
+
+
+class _TokenBucket:
+    """Async token bucket pacing calls to YouTube's metadata endpoints"""
+
+    def __init__(self, rate_per_minute: int):
+        self._capacity = float(rate_per_minute)
+        self._tokens = float(rate_per_minute)
+        self._rate = rate_per_minute / 60.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available, then consume it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self._rate)
 
-class DownloadService:
-    _instance = None
-    _initialized = False
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DownloadService, cls).__new__(cls)
-        return cls._instance
+class DownloadService:
+    """Shared download state; use the module-level `download_service` instance"""
 
     def __init__(self):
-        if not self._initialized:
-            self.download_progress: Dict[str, Dict[str, Any]] = {}
-            self.progress_subscribers: Dict[str, list] = {}
-            DownloadService._initialized = True
+        self.download_progress: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.progress_subscribers: Dict[str, Dict[str, Any]] = {}
+        self._info_cache: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._active_ids: Dict[tuple, str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._download_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        self._extract_limiter = _TokenBucket(EXTRACT_RATE_PER_MINUTE)
+        self._info_ydl = None
+        self._info_ydl_lock = threading.Lock()
+        self._background_tasks: set = set()
+        self._last_hook_ts: Dict[str, float] = {}
+        self._last_pct: Dict[str, int] = {}
+        self._loop = None
+        # Bumped by the keepalive ticker; SSE generators emit a keepalive
+        # when woken with this changed but the channel version unchanged
+        self.keepalive_gen = 0
+        self._keepalive_task = None
 
     def get_video_info(self, url: str) -> dict:
-        """Extract video information using yt-dlp"""
-        ydl_opts = YT_DLP_OPTIONS.copy()
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        """Extract video information using yt-dlp (cached with a short TTL)"""
+        cache_key = normalize_url(url)
+        cached = self._info_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < INFO_CACHE_TTL:
+            return cached[1]
+
+        # Reuse one extract-only YoutubeDL: constructing an instance
+        # reinstalls every extractor and rebuilds the request director, and
+        # keeping it alive keeps its connection pool warm. YoutubeDL is not
+        # reentrant, so extraction is serialized by the lock.
+        with self._info_ydl_lock:
+            if self._info_ydl is None:
+                self._info_ydl = yt_dlp.YoutubeDL(YT_DLP_OPTIONS.copy())
             try:
-                info = ydl.extract_info(url, download=False)
-                return info
-            except Exception as e:
-                raise Exception(f"Failed to extract video info: {str(e)}")
-
-    def progress_hook(self, d):
-        """Progress hook for yt-dlp downloads"""
-        download_id = d.get('info_dict', {}).get('_download_id')
-        if not download_id:
-            return
-
-        print(f"📊 Progress hook called for {download_id}: {d['status']}")
+                info = self._info_ydl.extract_info(url, download=False)
+            except yt_dlp.utils.DownloadError as e:
+                # Extractor-level failure (bad URL, geo-block, removed video)
+                raise RuntimeError(f"Failed to extract video info: {e}") from e
+
+            # Written under the lock; extraction threads share the cache
+            self._store_info(cache_key, info)
+        return info
+
+    def _store_info(self, cache_key: str, info: dict):
+        """Insert into the info cache, pruning expired and excess entries"""
+        now = time.monotonic()
+        cache = self._info_cache
+        cache[cache_key] = (now, info)
+        cache.move_to_end(cache_key)
+        for key in [k for k, (ts, _) in cache.items() if now - ts >= INFO_CACHE_TTL]:
+            del cache[key]
+        while len(cache) > INFO_CACHE_MAX:
+            cache.popitem(last=False)
+
+    async def _extract_info_shared(self, url: str) -> dict:
+        """Extract info in the executor, sharing one in-flight call per URL.
+
+        A burst of requests for the same video awaits a single extraction
+        instead of each hitting YouTube in parallel.
+        """
+        cache_key = normalize_url(url)
+        cached = self._info_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < INFO_CACHE_TTL:
+            return cached[1]
+
+        future = self._inflight.get(cache_key)
+        if future is not None:
+            return await future
+
+        # Claim the in-flight slot before waiting on the limiter, otherwise
+        # a burst for one URL all queue in the token bucket and each then
+        # runs its own extraction
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[cache_key] = future
+        try:
+            await self._extract_limiter.acquire()
+            info = await loop.run_in_executor(_EXECUTOR, self.get_video_info, url)
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve once ourselves so a waiterless failure does not log
+            # 'exception was never retrieved'
+            future.exception()
+            raise
+        else:
+            future.set_result(info)
+            return info
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    def progress_hook(self, d, download_id: str):
+        """Progress hook for yt-dlp downloads; the id is closure-bound"""
+        # Abort the worker thread as soon as a cancel request lands;
+        # yt-dlp treats this exception as a download abort
+        if self.download_progress.get(download_id, {}).get('status') == 'cancelled':
+            raise yt_dlp.utils.DownloadCancelled('cancelled by user')
 
         if d['status'] == 'downloading':
+            # Sample updates so formatting and fan-out stay off the
+            # download thread's hot loop
+            now = time.monotonic()
+            if now - self._last_hook_ts.get(download_id, 0.0) < PROGRESS_INTERVAL:
+                return
+            self._last_hook_ts[download_id] = now
+
             total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
             downloaded_bytes = d.get('downloaded_bytes', 0)
             speed = d.get('speed', 0)
             eta = d.get('eta')
 
             progress = (downloaded_bytes / total_bytes * 100) if total_bytes > 0 else 0
+            speed_str = format_speed(speed) if speed else "0 B/s"
+            eta_str = format_eta(eta)
 
             progress_data = {
                 'status': 'downloading',
                 'progress': min(progress, 100),
                 'downloaded_bytes': downloaded_bytes,
                 'total_bytes': total_bytes,
-                'speed': format_speed(speed) if speed else "0 B/s",
-                'eta': format_eta(eta),
+                'speed': speed_str,
+                'eta': eta_str,
                 'updated_at': datetime.now().isoformat()
             }
 
-            self.download_progress[download_id] = progress_data
-            self._notify_subscribers(download_id, progress_data)
-            print(f"📊 [{download_id[:8]}] {progress:.1f}% - {format_speed(speed) if speed else '0 B/s'} - ETA: {format_eta(eta)}")
+            self._set_progress(download_id, progress_data)
+            # Fan out to SSE subscribers only when the integer percentage
+            # moves; the polling endpoint still sees every snapshot above
+            pct = int(progress_data['progress'])
+            if pct != self._last_pct.get(download_id):
+                self._last_pct[download_id] = pct
+                self._notify_subscribers(download_id, progress_data)
+            logger.debug("[%s] %.1f%% - %s - ETA: %s", download_id[:8], progress, speed_str, eta_str)
 
         elif d['status'] == 'finished':
             progress_data = {
                 'status': 'completed',
                 'progress': 100,
+                # yt-dlp's reported path is authoritative, e.g. after a
+                # postprocessor rename
+                'filename': os.path.basename(d['filename']) if d.get('filename') else None,
+                'file_path': d.get('filename'),
                 'updated_at': datetime.now().isoformat()
             }
-            self.download_progress[download_id] = progress_data
+            self._set_progress(download_id, progress_data)
             self._notify_subscribers(download_id, progress_data)
-            print(f"✅ [{download_id[:8]}] Download completed")
+            logger.info("✅ [%s] Download completed", download_id[:8])
 
         elif d['status'] == 'error':
             progress_data = {
@@ -85,42 +281,126 @@ class DownloadService:
                 'error': str(d.get('error', 'Unknown error')),
                 'updated_at': datetime.now().isoformat()
             }
-            self.download_progress[download_id] = progress_data
+            self._set_progress(download_id, progress_data)
             self._notify_subscribers(download_id, progress_data)
-            print(f"❌ [{download_id[:8]}] Download failed: {d.get('error', 'Unknown error')}")
+            logger.error("❌ [%s] Download failed: %s", download_id[:8], d.get('error', 'Unknown error'))
+
+    def _set_progress(self, download_id: str, progress_data: dict):
+        """Store the latest progress snapshot, keeping the map LRU-bounded"""
+        self.download_progress[download_id] = progress_data
+        self.download_progress.move_to_end(download_id)
+        while len(self.download_progress) > PROGRESS_LRU_MAX:
+            evicted_id, _ = self.download_progress.popitem(last=False)
+            self._drop_download_state(evicted_id)
+        # Timed eviction hangs off the stored state itself so polled-only
+        # downloads (no SSE channel) are retired too
+        if progress_data.get('status') in TERMINAL_STATES:
+            self._schedule_cleanup(download_id)
+
+    def _schedule_cleanup(self, download_id: str):
+        """Arm the retention timer for a finished download; thread-safe"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._schedule_cleanup, download_id)
+            return
+        loop.call_later(PROGRESS_RETENTION, self._cleanup_download, download_id)
+
+    def _drop_download_state(self, download_id: str):
+        """Drop the side tables keyed by a download that is going away"""
+        self._last_hook_ts.pop(download_id, None)
+        self._last_pct.pop(download_id, None)
+        for key, did in list(self._active_ids.items()):
+            if did == download_id:
+                del self._active_ids[key]
+
+    def get_progress_channel(self, download_id: str) -> Dict[str, Any]:
+        """Get or create the broadcast channel shared by all subscribers"""
+        channel = self.progress_subscribers.get(download_id)
+        if channel is None:
+            channel = {
+                'state': None,
+                'frame': None,
+                'version': 0,
+                'cond': asyncio.Condition(),
+                'waiters': 0,
+            }
+            self.progress_subscribers[download_id] = channel
+        self._ensure_keepalive()
+        return channel
+
+    def _ensure_keepalive(self):
+        """Start the shared keepalive ticker on first use"""
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def _keepalive_loop(self):
+        """Wake every SSE channel on one timer so idle subscribers can ping"""
+        while True:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
+            self.keepalive_gen += 1
+            for channel in list(self.progress_subscribers.values()):
+                if channel['waiters'] > 0:
+                    self._wake_channel(channel['cond'])
+
+    def stop_keepalive(self):
+        """Cancel the keepalive ticker; called on app shutdown"""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
 
     def _notify_subscribers(self, download_id: str, progress_data: dict):
-        """Notify all subscribers of progress updates"""
-        if download_id in self.progress_subscribers:
-            for queue in self.progress_subscribers[download_id]:
-                try:
-                    queue.put_nowait(progress_data)
-                except:
-                    pass
+        """Publish a progress update on the download's broadcast channel"""
+        channel = self.progress_subscribers.get(download_id)
+        if channel is None:
+            return
+
+        channel['state'] = progress_data
+        # Encode the SSE frame once here rather than once per subscriber
+        channel['frame'] = SSE_PREFIX + orjson.dumps(progress_data) + SSE_SUFFIX
+        channel['version'] += 1
+        cond = channel['cond']
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Called from a yt-dlp worker thread; asyncio primitives are not
+            # thread-safe, so hand the wakeup to the event loop
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._wake_channel, cond)
+            return
+        self._wake_channel(cond)
+
+    def _wake_channel(self, cond: asyncio.Condition):
+        """Wake all channel waiters; must run on the event loop thread"""
+        async def _wake():
+            async with cond:
+                cond.notify_all()
+
+        asyncio.ensure_future(_wake())
+
+    def _cleanup_download(self, download_id: str):
+        """Evict state left behind by a finished download"""
+        self.download_progress.pop(download_id, None)
+        self._drop_download_state(download_id)
+        channel = self.progress_subscribers.get(download_id)
+        if channel is not None and channel['waiters'] <= 0:
+            del self.progress_subscribers[download_id]
 
     async def get_video_info_async(self, url: str) -> VideoInfo:
         """Get video information and available formats"""
-        print(f"🔍 Received video info request for: {url}")
-        
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            info = await loop.run_in_executor(executor, self.get_video_info, url)
+        logger.info("🔍 Received video info request for: %s", url)
 
-        print(f"✅ Successfully extracted info for: {info.get('title', 'Unknown')}")
+        self._loop = asyncio.get_running_loop()
+        info = await self._extract_info_shared(url)
 
-        formats = []
-        seen_formats = set()
+        logger.info("✅ Successfully extracted info for: %s", info.get('title', 'Unknown'))
 
         # Get all available formats
         all_formats = info.get('formats', [])
-        
-        # Create quality options based on available heights
-        available_heights = set()
-        for f in all_formats:
-            if f.get('height') and f.get('vcodec') != 'none':
-                available_heights.add(f.get('height'))
 
-        # Create format options for common qualities
+        # Quality ladder offered to the client, best first
         quality_options = [
             {'height': 1080, 'label': '1080p'},
             {'height': 720, 'label': '720p'},
@@ -129,59 +409,61 @@ class DownloadService:
             {'height': 240, 'label': '240p'},
         ]
 
+        # Single pass over the formats, keeping the best (largest) candidate
+        # per height instead of rescanning the list for every quality; store
+        # (filesize, format) so the incumbent's size is not re-fetched on
+        # every comparison
+        best_by_height = {}
+        for f in all_formats:
+            height = f.get('height')
+            if not height or f.get('vcodec') == 'none' or f.get('ext') not in ('mp4', 'webm'):
+                continue
+            filesize = f.get('filesize') or 0
+            current = best_by_height.get(height)
+            if current is None or filesize > current[0]:
+                best_by_height[height] = (filesize, f)
+
+        # Accumulate plain dicts and build the Pydantic models in one shot
+        # at the end, so validation only ever runs on the final selection
+        selected = []
         for quality in quality_options:
             height = quality['height']
-            if height in available_heights:
-                # Find the best format for this quality
-                best_format = None
-                for f in all_formats:
-                    if (f.get('height') == height and 
-                        f.get('vcodec') != 'none' and 
-                        f.get('ext') in ['mp4', 'webm']):
-                        if not best_format or f.get('filesize', 0) > best_format.get('filesize', 0):
-                            best_format = f
-
-                if best_format:
-                    resolution = get_resolution_string(best_format)
-                    formats.append(VideoFormat(
-                        format_id=f"best[height<={height}]",
-                        ext=best_format.get('ext', 'mp4'),
-                        resolution=resolution,
-                        filesize=best_format.get('filesize'),
-                        vcodec=best_format.get('vcodec', 'unknown'),
-                        acodec='bestaudio'  # Will be merged during download
-                    ))
+            entry = best_by_height.get(height)
+            if entry:
+                best_format = entry[1]
+                selected.append({
+                    'format_id': f"best[height<={height}]",
+                    'ext': best_format.get('ext', 'mp4'),
+                    'resolution': get_resolution_string(best_format),
+                    'height': height,
+                    'filesize': best_format.get('filesize'),
+                    'vcodec': best_format.get('vcodec', 'unknown'),
+                    'acodec': 'bestaudio',  # Will be merged during download
+                })
 
         # If no specific qualities found, add the best available
-        if not formats:
+        if not selected:
             for f in all_formats:
-                if f.get('vcodec') != 'none' and f.get('ext') in ['mp4', 'webm']:
-                    resolution = get_resolution_string(f)
-                    formats.append(VideoFormat(
-                        format_id=f['format_id'],
-                        ext=f.get('ext', 'mp4'),
-                        resolution=resolution,
-                        filesize=f.get('filesize'),
-                        vcodec=f.get('vcodec', 'unknown'),
-                        acodec='bestaudio'
-                    ))
+                if f.get('vcodec') != 'none' and f.get('ext') in ('mp4', 'webm'):
+                    selected.append({
+                        'format_id': f['format_id'],
+                        'ext': f.get('ext', 'mp4'),
+                        'resolution': get_resolution_string(f),
+                        'height': f.get('height') or 0,
+                        'filesize': f.get('filesize'),
+                        'vcodec': f.get('vcodec', 'unknown'),
+                        'acodec': 'bestaudio',
+                    })
                     break
 
-        def sort_key(format_item):
-            height = 0
-            if format_item.resolution.endswith('p'):
-                try:
-                    height = int(format_item.resolution.replace('p', ''))
-                except:
-                    height = 0
-            format_preference = 0 if format_item.ext == 'mp4' else 1
-            return (-height, format_preference)
+        formats = [VideoFormat(**entry) for entry in selected]
 
-        formats.sort(key=sort_key)
+        # quality_options is iterated best-first, so the list is already
+        # sorted by resolution
 
-        print(f"📋 Found {len(formats)} video format options")
+        logger.info("📋 Found %d video format options", len(formats))
         for fmt in formats:
-            print(f"   - {fmt.resolution} {fmt.ext.upper()} - {fmt.vcodec}")
+            logger.debug("   - %s %s - %s", fmt.resolution, fmt.ext.upper(), fmt.vcodec)
 
         return VideoInfo(
             title=info.get('title', 'Unknown Title'),
@@ -190,230 +472,151 @@ class DownloadService:
             formats=formats
         )
 
+    def _mark_downloading(self, download_id: str):
+        """Flip a queued download to 'downloading' and tell subscribers"""
+        progress_data = dict(self.download_progress.get(download_id, {}))
+        progress_data.update(status='downloading', updated_at=datetime.now().isoformat())
+        self._set_progress(download_id, progress_data)
+        self._notify_subscribers(download_id, progress_data)
+
     async def download_video_simple(self, url: str) -> str:
         """Download video using simple method with audio"""
-        download_id = get_download_id(url, "simple")
-        
-        print(f"⬇️ Starting simple download: {url}")
-        print(f"📋 Download ID: {download_id}")
-
-        # Check if already downloading
-        if download_id in self.download_progress:
-            existing = self.download_progress[download_id]
-            if existing['status'] in ['downloading']:
-                return download_id
-
-        # Initialize progress tracking
-        self.download_progress[download_id] = {
-            'status': 'downloading',
-            'progress': 0,
-            'downloaded_bytes': 0,
-            'total_bytes': 0,
-            'speed': "0 B/s",
-            'eta': "Unknown",
-            'updated_at': datetime.now().isoformat()
-        }
-
-        # Start download in background
-        asyncio.create_task(self._download_task_simple(url, download_id))
-        return download_id
+        return await self._start_download(url, "simple")
 
-    async def _download_task_simple(self, url: str, download_id: str):
-        """Background task for simple download"""
-        try:
-            # Get video info for title
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                info = await loop.run_in_executor(executor, self.get_video_info, url)
-
-            title = info.get('title', 'Unknown Title')
-            safe_title = sanitize_filename(title)
-
-            # Prepare output filename
-            output_filename = f"{safe_title}.mp4"
-            output_path = os.path.join(DOWNLOADS_DIR, output_filename)
-
-            # Simple download options with audio
-            ydl_opts = {
-                'format': 'best[height<=1080]+bestaudio/best[height<=720]+bestaudio/best[height<=480]+bestaudio/best',
-                'outtmpl': output_path,
-                'progress_hooks': [self.progress_hook],
-                'quiet': False,
-                'no_warnings': False,
-                'extractor_retries': 2,
-                'fragment_retries': 2,
-                'retries': 2,
-                'http_chunk_size': 1048576,
-                'concurrent_fragment_downloads': 1,
-                'sleep_interval': 5,
-                'max_sleep_interval': 20,
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
-                },
-                'postprocessors': [{
-                    'key': 'FFmpegVideoConvertor',
-                    'preferedformat': 'mp4',
-                }],
-                'merge_output_format': 'mp4',
-                'prefer_ffmpeg': True,
-            }
-
-            def download_video_sync():
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info_dict = ydl.extract_info(url, download=False)
-                    info_dict['_download_id'] = download_id
-                    print(f"🔍 Info extracted, starting simple download with ID: {download_id}")
-                    ydl.download([url])
-
-            # Run download in thread pool
-            with ThreadPoolExecutor() as executor:
-                await loop.run_in_executor(executor, download_video_sync)
-
-            # Check if file was downloaded successfully
-            if os.path.exists(output_path):
-                progress_data = {
-                    'status': 'completed',
-                    'progress': 100,
-                    'filename': output_filename,
-                    'file_path': output_path,
-                    'updated_at': datetime.now().isoformat()
-                }
-                self.download_progress[download_id] = progress_data
-                self._notify_subscribers(download_id, progress_data)
-                print(f"✅ Simple download completed: {output_filename}")
-            else:
-                raise Exception("File was not downloaded")
+    async def download_video_quality(self, url: str, quality: str) -> str:
+        """Download video with specific quality"""
+        return await self._start_download(url, quality)
 
-        except Exception as e:
-            error_msg = str(e)
-            print(f"❌ Simple download failed: {error_msg}")
+    async def _start_download(self, url: str, variant: str) -> str:
+        """Register a download and kick off its background task"""
+        self._loop = asyncio.get_running_loop()
 
-            progress_data = {
-                'status': 'failed',
-                'error': error_msg,
-                'updated_at': datetime.now().isoformat()
-            }
-            self.download_progress[download_id] = progress_data
-            self._notify_subscribers(download_id, progress_data)
+        # Reuse the in-flight download for a repeated request, but only if
+        # it is actually still running
+        existing_id = self._active_ids.get((url, variant))
+        if existing_id and self.download_progress.get(existing_id, {}).get('status') in ('queued', 'downloading'):
+            return existing_id
 
-    async def download_video_quality(self, url: str, quality: str) -> str:
-        """Download video with specific quality"""
-        download_id = get_download_id(url, quality)
-        
-        print(f"⬇️ Starting {quality} download: {url}")
-        print(f"📋 Download ID: {download_id}")
+        download_id = get_download_id()
+        self._active_ids[(url, variant)] = download_id
 
-        # Check if already downloading
-        if download_id in self.download_progress:
-            existing = self.download_progress[download_id]
-            if existing['status'] in ['downloading']:
-                return download_id
+        logger.info("⬇️ Starting %s download: %s", variant, url)
+        logger.info("📋 Download ID: %s", download_id)
 
-        # Initialize progress tracking
-        self.download_progress[download_id] = {
-            'status': 'downloading',
+        # Initialize progress tracking; the task flips this to 'downloading'
+        # once it gets a download slot
+        self._set_progress(download_id, {
+            'status': 'queued',
             'progress': 0,
             'downloaded_bytes': 0,
             'total_bytes': 0,
             'speed': "0 B/s",
             'eta': "Unknown",
             'updated_at': datetime.now().isoformat()
-        }
+        })
 
-        # Start download in background
-        asyncio.create_task(self._download_task_quality(url, download_id, quality))
+        # Start download in background, keeping a strong reference so the
+        # task cannot be garbage-collected mid-download
+        task = asyncio.create_task(self._download_task(url, download_id, variant))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
         return download_id
 
-    async def _download_task_quality(self, url: str, download_id: str, quality: str):
-        """Background task for quality-specific download"""
+    async def _download_task(self, url: str, download_id: str, variant: str):
+        """Background download task, gated by the download cap"""
+        async with self._download_semaphore:
+            if self.download_progress.get(download_id, {}).get('status') == 'cancelled':
+                return
+            self._mark_downloading(download_id)
+            await self._run_download(url, download_id, variant)
+
+    async def _run_download(self, url: str, download_id: str, variant: str):
+        """Perform a download once a slot is held"""
         try:
             # Get video info for title
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                info = await loop.run_in_executor(executor, self.get_video_info, url)
+            loop = asyncio.get_running_loop()
+            info = await self._extract_info_shared(url)
 
             title = info.get('title', 'Unknown Title')
             safe_title = sanitize_filename(title)
 
             # Prepare output filename
-            output_filename = f"{safe_title}_{quality}.mp4"
+            suffix = '' if variant == 'simple' else f"_{variant}"
+            output_filename = f"{safe_title}{suffix}.mp4"
             output_path = os.path.join(DOWNLOADS_DIR, output_filename)
 
-            # Quality-specific format selection
-            if quality == "1080p":
-                format_selector = "best[height<=1080]+bestaudio/best[height<=1080]/best"
-            elif quality == "720p":
-                format_selector = "best[height<=720]+bestaudio/best[height<=720]/best"
-            elif quality == "480p":
-                format_selector = "best[height<=480]+bestaudio/best[height<=480]/best"
-            elif quality == "360p":
-                format_selector = "best[height<=360]+bestaudio/best[height<=360]/best"
-            else:
-                format_selector = "best+bestaudio/best"
+            def bound_progress_hook(d):
+                # Close over the id; the cached info dict is shared between
+                # downloads and must not be stamped with per-download state
+                return self.progress_hook(d, download_id)
 
-            # Download options with quality-specific format
+            profile = DOWNLOAD_PROFILES.get(variant, FALLBACK_PROFILE)
             ydl_opts = {
-                'format': format_selector,
+                **BASE_DOWNLOAD_OPTS,
+                **profile,
                 'outtmpl': output_path,
-                'progress_hooks': [self.progress_hook],
-                'quiet': False,
-                'no_warnings': False,
-                'extractor_retries': 3,
-                'fragment_retries': 3,
-                'retries': 3,
-                'http_chunk_size': 1048576,
-                'concurrent_fragment_downloads': 1,
-                'sleep_interval': 2,
-                'max_sleep_interval': 10,
-                'http_headers': {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                },
-                'postprocessors': [{
-                    'key': 'FFmpegVideoConvertor',
-                    'preferedformat': 'mp4',
-                }],
-                'merge_output_format': 'mp4',
-                'prefer_ffmpeg': True,
+                'progress_hooks': [bound_progress_hook],
             }
 
             def download_video_sync():
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info_dict = ydl.extract_info(url, download=False)
-                    info_dict['_download_id'] = download_id
-                    print(f"🔍 Info extracted, starting {quality} download with ID: {download_id}")
-                    ydl.download([url])
+                    logger.info("🔍 Reusing extracted info, starting %s download with ID: %s", variant, download_id)
+                    # process_ie_result mutates the dict heavily (selected
+                    # format, resolved URLs, requested_downloads); hand it a
+                    # private copy so concurrent downloads and later cache
+                    # hits keep seeing the pristine extraction
+                    ydl.process_ie_result(copy.deepcopy(info), download=True)
 
             # Run download in thread pool
-            with ThreadPoolExecutor() as executor:
-                await loop.run_in_executor(executor, download_video_sync)
-
-            # Check if file was downloaded successfully
-            if os.path.exists(output_path):
+            try:
+                await loop.run_in_executor(_EXECUTOR, download_video_sync)
+            except yt_dlp.utils.DownloadCancelled:
+                logger.info("🚫 Download cancelled, worker stopped: %s", download_id)
+                return
+
+            # The per-format 'finished' hook fires once per downloaded
+            # stream with that stream's part file (e.g. *.f251.webm), which
+            # the merge postprocessor then deletes — so the reported path is
+            # only authoritative if it still exists. Stats run in the
+            # executor: the downloads dir may be a network mount
+            reported_path = self.download_progress.get(download_id, {}).get('file_path')
+            final_path = None
+            if reported_path and await loop.run_in_executor(_EXECUTOR, os.path.exists, reported_path):
+                final_path = reported_path
+            elif await loop.run_in_executor(_EXECUTOR, os.path.exists, output_path):
+                final_path = output_path
+
+            if final_path:
                 progress_data = {
                     'status': 'completed',
                     'progress': 100,
-                    'filename': output_filename,
-                    'file_path': output_path,
+                    'filename': os.path.basename(final_path),
+                    'file_path': final_path,
                     'updated_at': datetime.now().isoformat()
                 }
-                self.download_progress[download_id] = progress_data
+                self._set_progress(download_id, progress_data)
                 self._notify_subscribers(download_id, progress_data)
-                print(f"✅ {quality} download completed: {output_filename}")
+                logger.info("✅ %s download completed: %s", variant, progress_data['filename'])
             else:
                 raise Exception("File was not downloaded")
 
         except Exception as e:
             error_msg = str(e)
-            print(f"❌ {quality} download failed: {error_msg}")
+            logger.error("❌ %s download failed: %s", variant, error_msg)
 
             progress_data = {
                 'status': 'failed',
                 'error': error_msg,
                 'updated_at': datetime.now().isoformat()
             }
-            self.download_progress[download_id] = progress_data
+            self._set_progress(download_id, progress_data)
             self._notify_subscribers(download_id, progress_data)
 
+    async def wait_for_downloads(self):
+        """Wait for in-flight download tasks; called on app shutdown"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
     def get_download_progress(self, download_id: str) -> dict:
         """Get current download progress"""
         return self.download_progress.get(download_id, {})
@@ -425,9 +628,9 @@ class DownloadService:
                 'status': 'cancelled',
                 'updated_at': datetime.now().isoformat()
             }
-            self.download_progress[download_id] = progress_data
+            self._set_progress(download_id, progress_data)
             self._notify_subscribers(download_id, progress_data)
-            print(f"✅ Download cancelled: {download_id}")
+            logger.info("✅ Download cancelled: %s", download_id)
             return True
         return False
 
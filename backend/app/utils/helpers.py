@@ -1,20 +1,38 @@
-import hashlib
 import re
+import uuid
+from bisect import bisect_right
+from functools import lru_cache
 from datetime import datetime
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 
+# Query parameters that do not change which video is downloaded
+_IGNORED_URL_PARAMS = {'t', 'list', 'index', 'start_radio', 'pp'}
 
-def get_download_id(url: str, format_id: str) -> str:
-    """Generate unique download ID based on URL and format"""
-    content = f"{url}_{format_id}"
-    return hashlib.md5(content.encode()).hexdigest()
+# Characters stripped from filenames: Windows-reserved plus their
+# fullwidth CJK equivalents, combined into one pass
+_FILENAME_BAD_CHARS = re.compile(r'[<>:"/\\|?*\uff1a\uff0c\uff01\uff1f]')
 
 
+def normalize_url(url: str) -> str:
+    """Strip playlist/timestamp query params so equivalent URLs share a key"""
+    parsed = urlparse(url)
+    params = [(k, v) for k, v in parse_qsl(parsed.query) if k not in _IGNORED_URL_PARAMS]
+    return urlunparse(parsed._replace(query=urlencode(params)))
+
+
+def get_download_id() -> str:
+    """Generate a unique download ID"""
+    # The ID is just a dict key; a random token needs no hashing and never
+    # collides with a finished download's stale state
+    return uuid.uuid4().hex[:16]
+
+
+@lru_cache(maxsize=1024)
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename to remove problematic characters"""
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-    filename = re.sub(r'[\uff1a\uff0c\uff01\uff1f]', '', filename)
-    filename = filename.strip()
-    return filename
+    # The same title recurs across repeat and multi-quality downloads;
+    # memoize the regex pass for those
+    return _FILENAME_BAD_CHARS.sub('', filename).strip()
 
 
 def format_duration(seconds):
@@ -32,13 +50,19 @@ def format_duration(seconds):
         return f"{minutes:02d}:{seconds:02d}"
 
 
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB")
+_BYTE_THRESHOLDS = (1 << 10, 1 << 20, 1 << 30, 1 << 40)
+
+
 def format_bytes(bytes_value):
     """Format bytes to human readable format"""
-    if bytes_value == 0:
+    if not bytes_value or bytes_value <= 0:
         return "0 B"
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = int(bytes_value.bit_length() / 10)
-    return f"{bytes_value / (1 << (i * 10)):.1f} {size_names[i]}"
+    # Hot path: per-chunk speeds are usually small
+    if bytes_value < 1024:
+        return f"{float(bytes_value):.1f} B"
+    i = min(bisect_right(_BYTE_THRESHOLDS, bytes_value), 4)
+    return f"{bytes_value / (1 << (i * 10)):.1f} {_BYTE_UNITS[i]}"
 
 
 def format_speed(bytes_per_sec):